@@ -1,13 +1,16 @@
 """
 Configuration management for the server.
-Uses Pydantic settings for type-safe configuration.
+Uses msgspec structs for type-safe configuration.
 """
 
-from pydantic_settings import BaseSettings
+import os
+from functools import lru_cache
 from typing import Optional
+import msgspec
+from dotenv import dotenv_values
 
 
-class Settings(BaseSettings):
+class Settings(msgspec.Struct):
     """Application settings loaded from environment variables."""
 
     # Environment
@@ -38,19 +41,13 @@ class Settings(BaseSettings):
     openai_api_base: str = "https://api.openai.com"
     openai_model: str = "gpt-realtime"
 
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = False
-        extra = "ignore"  # Ignore extra environment variables
-
-
-_settings: Optional[Settings] = None
-
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """Get or create settings singleton."""
-    global _settings
-    if _settings is None:
-        _settings = Settings()
-    return _settings
+    # Environment variables take precedence over values from .env
+    env = {**dotenv_values(".env", encoding="utf-8"), **os.environ}
+    # Case-insensitive keys; unknown keys are ignored by the struct
+    values = {key.lower(): value for key, value in env.items() if value is not None}
+    # strict=False lets string values decode into int fields
+    return msgspec.convert(values, Settings, strict=False)
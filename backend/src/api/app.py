@@ -0,0 +1,107 @@
+"""
+FastAPI application for OpenAI Realtime API integration.
+Importing this module has no side effects beyond building the app; shared
+instances are created in the lifespan startup.
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse, Response
+from fastapi.utils import is_body_allowed_for_status_code
+from fastapi.middleware.cors import CORSMiddleware
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+from config import get_settings
+from src.api import shared
+from src.api.middleware import APIKeyMiddleware
+from src.api.routes import health, usage, realtime
+from src.api.routes.realtime import create_http_session, warmup_http_session
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Lifespan context manager for startup and shutdown events."""
+    # Startup
+    logger.info("Starting server...")
+    logger.info("Server will run on port %s", settings.port)
+    logger.info("Frontend URL: %s", settings.frontend_url)
+
+    # Initialize shared storage and usage tracker
+    shared.initialize_shared_instances(
+        mongodb_url=settings.mongodb_url,
+        mongodb_database=settings.mongodb_database,
+        token_limit=settings.token_limit_per_ip,
+        reset_period_hours=settings.token_reset_period_hours,
+    )
+
+    # Shared HTTP client for OpenAI API calls
+    app.state.http = create_http_session()
+
+    # Pre-connect to MongoDB and warm the OpenAI connection concurrently
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(shared.storage._connect())
+            tg.create_task(warmup_http_session(app.state.http))
+        logger.info("MongoDB connection established at startup")
+    except* Exception as eg:
+        # Log the underlying errors rather than the TaskGroup wrapper
+        for e in eg.exceptions:
+            logger.error(
+                "Failed to connect to MongoDB at startup: %s", e, exc_info=e
+            )
+        await app.state.http.close()
+        await shared.close_shared_instances()
+        raise
+
+    yield
+    # Shutdown
+    logger.info("Shutting down server...")
+    await app.state.http.close()
+    await shared.close_shared_instances()
+
+
+app = FastAPI(
+    title="Wrong by Default API",
+    description="Voice AI that pushes back on your thinking - OpenAI Realtime API integration server",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+
+
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_handler(
+    request: Request, exc: StarletteHTTPException
+) -> Response:
+    """Render HTTP errors with orjson so details may carry datetimes."""
+    headers = getattr(exc, "headers", None)
+    if not is_body_allowed_for_status_code(exc.status_code):
+        return Response(status_code=exc.status_code, headers=headers)
+    return ORJSONResponse(
+        {"detail": exc.detail}, status_code=exc.status_code, headers=headers
+    )
+
+
+# Verify the backend API key before routing (added first so CORS wraps it and
+# auth errors still carry CORS headers)
+app.add_middleware(APIKeyMiddleware, api_key=settings.backend_api_key)
+
+# Enable CORS for the frontend
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=[settings.frontend_url],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# Include routers
+app.include_router(health.router)
+app.include_router(usage.router)
+app.include_router(realtime.router)
@@ -2,12 +2,67 @@
 Shared dependencies and utilities for API routes.
 """
 
-from fastapi import Request, HTTPException, Depends
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from config import get_settings
+import ipaddress
+import socket
+import sys
+from fastapi import Request
 
-settings = get_settings()
-security = HTTPBearer()
+# Private, loopback, link-local and carrier-grade NAT IPv4 ranges as
+# (netmask, network) pairs over the address as a big-endian uint32
+_PRIVATE_V4 = (
+    (0xFF000000, 0x0A000000),  # 10.0.0.0/8
+    (0xFFF00000, 0xAC100000),  # 172.16.0.0/12
+    (0xFFFF0000, 0xC0A80000),  # 192.168.0.0/16
+    (0xFFC00000, 0x64400000),  # 100.64.0.0/10
+    (0xFF000000, 0x7F000000),  # 127.0.0.0/8
+    (0xFFFF0000, 0xA9FE0000),  # 169.254.0.0/16
+)
+
+# Loopback, unique local and link-local IPv6 ranges, parsed once
+_PRIVATE_V6 = tuple(
+    ipaddress.ip_network(network) for network in ("::1/128", "fc00::/7", "fe80::/10")
+)
+
+
+def _is_private(address: str) -> bool:
+    """Check whether an address is private (or not an IP address at all)."""
+    try:
+        # inet_pton only accepts dotted quads, unlike inet_aton
+        n = int.from_bytes(socket.inet_pton(socket.AF_INET, address), "big")
+    except OSError:
+        pass
+    else:
+        return any(n & mask == network for mask, network in _PRIVATE_V4)
+
+    # IPv6 (and anything unparseable) takes the slower ipaddress path
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return True
+    return any(ip in network for network in _PRIVATE_V6)
+
+
+def _leftmost_public_ip(forwarded_for: str) -> str:
+    """
+    Get the leftmost non-private address from an X-Forwarded-For value.
+
+    Scans by index so no list of hops is built. Falls back to the first hop
+    if every hop is private (e.g. local development).
+    """
+    first = ""
+    start = 0
+    length = len(forwarded_for)
+    while start < length:
+        end = forwarded_for.find(",", start)
+        if end < 0:
+            end = length
+        hop = forwarded_for[start:end].strip()
+        if hop:
+            if not _is_private(hop):
+                return hop
+            first = first or hop
+        start = end + 1
+    return first
 
 
 def get_client_ip(request: Request) -> str:
@@ -18,10 +73,12 @@ def get_client_ip(request: Request) -> str:
     # Check X-Forwarded-For header (most common in Cloud Run/proxies)
     forwarded_for = request.headers.get("X-Forwarded-For")
     if forwarded_for:
-        # X-Forwarded-For can contain multiple IPs, take the first one (original client)
-        client_ip = forwarded_for.split(",")[0].strip()
+        # X-Forwarded-For can contain multiple IPs; the leftmost public one is
+        # the original client (private hops are internal proxies)
+        client_ip = _leftmost_public_ip(forwarded_for)
         if client_ip:
-            return client_ip
+            # Interned so repeated per-IP dict lookups hash and compare cheaply
+            return sys.intern(client_ip)
 
     # Check X-Real-IP header (alternative)
     real_ip = request.headers.get("X-Real-IP")
@@ -33,27 +90,3 @@ def get_client_ip(request: Request) -> str:
         return request.client.host
 
     return "unknown"
-
-
-async def verify_api_key(
-    authorization: HTTPAuthorizationCredentials = Depends(security),
-) -> bool:
-    """Verify API key from Authorization header."""
-    if not settings.backend_api_key:
-        # If no API key is configured, allow all requests (development mode)
-        return True
-
-    if not authorization:
-        raise HTTPException(
-            status_code=401,
-            detail="Missing API key. Please provide an Authorization header with Bearer token.",
-        )
-
-    provided_key = authorization.credentials
-    if provided_key != settings.backend_api_key:
-        raise HTTPException(
-            status_code=403,
-            detail="Invalid API key.",
-        )
-
-    return True
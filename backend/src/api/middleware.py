@@ -0,0 +1,62 @@
+"""
+ASGI middleware for API routes.
+"""
+
+import hmac
+from typing import Optional
+from fastapi.responses import ORJSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Paths reachable without an API key (health checks and API docs)
+_PUBLIC_PATHS = frozenset(
+    {"/health", "/docs", "/docs/oauth2-redirect", "/redoc", "/openapi.json"}
+)
+
+
+class APIKeyMiddleware:
+    """
+    Verify the backend API key from the Authorization header.
+
+    Runs once per request before routing, so protected routes don't need a
+    per-route dependency. CORS preflights (OPTIONS) and public paths are passed
+    through untouched. If no API key is configured, all requests are allowed
+    (development mode).
+    """
+
+    def __init__(self, app: ASGIApp, api_key: Optional[str] = None) -> None:
+        self.app = app
+        self.api_key = api_key.encode() if api_key else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            self.api_key is None
+            or scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or scope["path"] in _PUBLIC_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        # Scan the raw ASGI headers (names are already lowercase) and compare
+        # bytes, rather than building a Headers mapping and decoding the value
+        authorization = b""
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                authorization = value
+                break
+        scheme, _, credentials = authorization.partition(b" ")
+        if scheme.lower() != b"bearer" or not credentials:
+            response = ORJSONResponse(
+                {
+                    "detail": "Missing API key. Please provide an Authorization header with Bearer token."
+                },
+                status_code=401,
+            )
+        # Constant-time comparison to avoid leaking the key through timing
+        elif not hmac.compare_digest(credentials, self.api_key):
+            response = ORJSONResponse({"detail": "Invalid API key."}, status_code=403)
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        await response(scope, receive, send)
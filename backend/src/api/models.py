@@ -2,6 +2,7 @@
 Pydantic models for API request and response validation.
 """
 
+from datetime import datetime
 from pydantic import BaseModel, Field
 
 
@@ -18,14 +19,20 @@ class UsageInfo(BaseModel):
     last_used_tokens: int = Field(
         ..., description="Tokens used in the current reset period"
     )
-    total_tokens: int = Field(..., description="Total tokens used across all time")
+    total_tokens: int = Field(
+        ...,
+        description=(
+            "Tokens used since the client's usage record was created; records "
+            "idle for two reset periods are deleted, restarting this count"
+        ),
+    )
     tokens_limit: int = Field(
         ..., description="Maximum tokens allowed per reset period"
     )
     tokens_remaining: int = Field(
         ..., description="Tokens remaining in the current period"
     )
-    reset_at: str = Field(..., description="ISO datetime string when usage will reset")
+    reset_at: datetime = Field(..., description="When usage will reset (UTC)")
     limit_exceeded: bool = Field(
         ..., description="Whether the usage limit has been exceeded"
     )
@@ -52,6 +59,12 @@ class UsageLimitErrorDetail(BaseModel):
     usage: UsageInfo = Field(..., description="Current usage information")
 
 
+class UsageLimitError(BaseModel):
+    """Response body returned when the usage limit is exceeded (429)."""
+
+    detail: UsageLimitErrorDetail = Field(..., description="Error details")
+
+
 class SessionCreateRequest(BaseModel):
     """Request model for creating a Realtime API session."""
 
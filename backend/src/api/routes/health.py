@@ -1,20 +1,26 @@
 """Health check routes."""
 
-from fastapi import APIRouter
+import orjson
+from fastapi import APIRouter, Response
 from src.api.models import HealthResponse
 
 router = APIRouter()
 
+# The health payload never changes, so serialize it once
+_HEALTH_BODY = orjson.dumps(
+    HealthResponse(status="healthy", service="wrong-by-default-api").model_dump()
+)
 
-@router.get("/health", response_model=HealthResponse)
-async def health_check() -> HealthResponse:
+
+@router.get("/health", responses={200: {"model": HealthResponse}})
+async def health_check() -> Response:
     """
     Health check endpoint.
 
     Returns the current health status of the API server.
 
     Returns:
-        HealthResponse: Response containing the service status and name.
+        Response: Pre-serialized HealthResponse JSON with the service status and name.
 
     Example:
         ```json
@@ -24,4 +30,5 @@ async def health_check() -> HealthResponse:
         }
         ```
     """
-    return HealthResponse(status="healthy", service="wrong-by-default-api")
+    # A fresh Response per request: middleware may append to its header list
+    return Response(content=_HEALTH_BODY, media_type="application/json")
@@ -2,13 +2,18 @@
 
 import logging
 import ssl
-from datetime import datetime, timedelta
-from fastapi import APIRouter, Request, HTTPException, Depends, Response
+from fastapi import APIRouter, Request, HTTPException, Response
 import aiohttp
-from src.api.models import UsageInfo, UsageLimitErrorDetail
-from src.api.dependencies import get_client_ip, verify_api_key
+import orjson
+from src.api.models import SessionCreateRequest, UsageLimitError
+from src.api.dependencies import get_client_ip
 from src.api import shared
-from src.prompts import get_instructions_for_mode, get_voice_for_mode
+from src.api.routing import ORJSONRoute
+from src.prompts import (
+    get_available_modes,
+    get_instructions_for_mode,
+    get_voice_for_mode,
+)
 from config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -22,32 +27,72 @@ try:
 except ImportError:
     SSL_CERT_PATH = None
 
-router = APIRouter()
+# Parse the CA bundle once per process rather than per HTTP session
+_SSL_CONTEXT = (
+    ssl.create_default_context(cafile=SSL_CERT_PATH)
+    if SSL_CERT_PATH
+    else ssl.create_default_context()
+)
 
+router = APIRouter(route_class=ORJSONRoute)
 
-def get_session_config(mode_id: str) -> str:
-    """
-    Generate OpenAI Realtime API session configuration for a given thinking mode.
+# Static OpenAI request headers, built once instead of per request
+_OPENAI_HEADERS: dict[str, str] = (
+    {"Authorization": f"Bearer {settings.openai_api_key}"}
+    if settings.openai_api_key
+    else {}
+)
 
-    Creates a JSON configuration string that specifies:
-    - Model type (realtime)
-    - Audio input settings (transcription model, turn detection)
-    - Audio output settings (voice selection based on mode)
-    - System instructions (prompt based on mode)
+_DEFAULT_MODE_ID = "devils-advocate"
+_VALID_MODES = frozenset(get_available_modes())
 
-    Args:
-        mode_id: Identifier for the thinking mode (e.g., "devils-advocate",
-            "first-principles", "edge-case", "second-order").
+
+def create_http_session() -> aiohttp.ClientSession:
+    """
+    Create the shared HTTP client session used to call the OpenAI API.
+
+    The session owns a pooled connector so TCP connections and TLS sessions
+    to the OpenAI API are reused across requests. It is created once at
+    application startup and must be closed on shutdown.
 
     Returns:
-        str: JSON string containing the session configuration.
+        aiohttp.ClientSession: Client session with a pooled TLS connector.
+    """
+    connector = aiohttp.TCPConnector(ssl=_SSL_CONTEXT, limit=100, keepalive_timeout=75)
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=30),
+    )
 
-    Raises:
-        ValueError: If mode_id is invalid or not found.
+
+async def warmup_http_session(
+    http_session: aiohttp.ClientSession, timeout: float = 5.0
+) -> None:
+    """
+    Open a pooled connection to the OpenAI API ahead of the first request.
+
+    Sends a HEAD request to the API base URL so DNS resolution and the TCP/TLS
+    handshake happen at startup. Failures are logged and ignored; the first
+    session request will simply connect on demand.
+
+    Args:
+        http_session: The shared client session created by create_http_session().
+        timeout: Seconds to wait before giving up, so an unreachable API
+            doesn't hold up startup (default: 5)
     """
-    import json
+    try:
+        async with http_session.head(
+            settings.openai_api_base, timeout=aiohttp.ClientTimeout(total=timeout)
+        ):
+            pass
+        logger.info("Warmed up connection to %s", settings.openai_api_base)
+    except Exception as e:
+        logger.warning("OpenAI connection warmup failed: %s", e)
+
 
-    base_config = {
+def _build_session_config(mode_id: str) -> dict:
+    """Build the OpenAI Realtime API session configuration dict for a mode."""
+    return {
         "type": "realtime",
         "model": settings.openai_model,
         "audio": {
@@ -69,13 +114,153 @@ def get_session_config(mode_id: str) -> str:
         },
         "instructions": get_instructions_for_mode(mode_id),
     }
-    return json.dumps(base_config)
 
 
-@router.post("/api/realtime/session")
+# Session configs only depend on settings and static prompts, so serialize them
+# once; kept as UTF-8 bytes so the (multi-KB) prompt isn't re-encoded per request
+_SESSION_CONFIG_JSON: dict[str, bytes] = {
+    mode_id: orjson.dumps(_build_session_config(mode_id))
+    for mode_id in get_available_modes()
+}
+
+
+def get_session_config(mode_id: str) -> bytes:
+    """
+    Get the OpenAI Realtime API session configuration for a given thinking mode.
+
+    The configuration JSON specifies:
+    - Model type (realtime)
+    - Audio input settings (transcription model, turn detection)
+    - Audio output settings (voice selection based on mode)
+    - System instructions (prompt based on mode)
+
+    Configurations are pre-serialized at import time for every available mode.
+
+    Args:
+        mode_id: Identifier for the thinking mode (e.g., "devils-advocate",
+            "first-principles", "edge-case", "second-order").
+
+    Returns:
+        bytes: UTF-8 encoded JSON containing the session configuration. Unknown
+            mode IDs fall back to the default mode's configuration.
+    """
+    return _SESSION_CONFIG_JSON.get(mode_id, _SESSION_CONFIG_JSON[_DEFAULT_MODE_ID])
+
+
+async def _create_realtime_session(request: Request, sdp: str, mode_id: str) -> Response:
+    """
+    Check the client's usage limit and exchange an SDP offer with OpenAI.
+
+    Args:
+        request: FastAPI Request object used to extract client IP and app state.
+        sdp: SDP offer string from WebRTC.
+        mode_id: Thinking mode identifier; unknown modes fall back to the default.
+
+    Returns:
+        Response: SDP answer from OpenAI with content-type "application/sdp".
+    """
+    mode_id = mode_id if mode_id in _VALID_MODES else _DEFAULT_MODE_ID
+
+    if shared.usage_tracker is None:
+        raise HTTPException(status_code=500, detail="Usage tracker not initialized")
+
+    client_ip = get_client_ip(request)
+
+    # Check token usage limit
+    allowed, usage_info = await shared.usage_tracker.check_limit(client_ip)
+    if not allowed:
+        # reset_at stays a datetime; the ORJSON exception handler serializes it
+        raise HTTPException(
+            status_code=429,
+            detail={
+                "error": "Usage limit exceeded",
+                "message": "Usage limit reached. Resets in 24 hours.",
+                "usage": usage_info,
+            },
+        )
+
+    logger.info(
+        "Session creation request from %s (current: %d/%d, total: %d)",
+        client_ip,
+        usage_info["last_used_tokens"],
+        usage_info["tokens_limit"],
+        usage_info["total_tokens"],
+    )
+
+    if not sdp:
+        logger.warning("SDP data missing or invalid in request")
+        raise HTTPException(status_code=400, detail="SDP data is required")
+
+    if not settings.openai_api_key:
+        logger.error("OpenAI API key not configured")
+        raise HTTPException(
+            status_code=500, detail="Server configuration error: OpenAI API key not set"
+        )
+
+    session_config = get_session_config(mode_id)
+    logger.info("Creating session for mode: %s", mode_id)
+
+    try:
+        # OpenAI Realtime API expects multipart/form-data with sdp and session fields
+        form_data = aiohttp.FormData(default_to_multipart=True)
+        form_data.add_field("sdp", sdp)
+        # Wrap the pre-encoded config in a payload so it's sent as a plain form
+        # field (raw bytes would become a file upload)
+        form_data.add_field(
+            "session",
+            aiohttp.BytesPayload(
+                session_config, content_type="text/plain; charset=utf-8"
+            ),
+        )
+
+        # Reuse the app-wide HTTP session so keep-alive connections are pooled
+        http_session: aiohttp.ClientSession = request.app.state.http
+        async with http_session.post(
+            f"{settings.openai_api_base}/v1/realtime/calls",
+            headers=_OPENAI_HEADERS,
+            data=form_data,
+        ) as response:
+            if not response.ok:
+                error_text = await response.text()
+                logger.error(
+                    "OpenAI API error: %s - %s", response.status, error_text[:200]
+                )
+                raise HTTPException(
+                    status_code=response.status,
+                    detail={
+                        "error": "Failed to create session",
+                        "details": error_text,
+                    },
+                )
+
+            # Send back the SDP we received from the OpenAI REST API
+            answer_sdp = await response.text()
+            logger.info("Successfully created session for mode: %s", mode_id)
+            return Response(content=answer_sdp, media_type="application/sdp")
+
+    except aiohttp.ClientError as e:
+        logger.error("Network error during session creation: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail={"error": "Failed to create session", "details": str(e)},
+        )
+    except Exception as e:
+        logger.error(
+            "Unexpected error during session creation: %s", e, exc_info=True
+        )
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": "Internal server error",
+                "details": "An unexpected error occurred",
+            },
+        )
+
+
+@router.post("/api/realtime/session", responses={429: {"model": UsageLimitError}})
 async def create_session(
+    payload: SessionCreateRequest,
     request: Request,
-    _: bool = Depends(verify_api_key),
 ):
     """
     Create a new OpenAI Realtime API WebRTC session.
@@ -86,19 +271,17 @@ async def create_session(
     - Mode-specific configuration (voice, prompts)
     - Error handling and limit exceeded responses
 
-    The endpoint accepts requests in two formats:
-    1. JSON: `{"sdp": "...", "modeId": "devils-advocate"}`
-    2. Plain text: SDP as body, modeId as query parameter
+    The request body is JSON validated against `SessionCreateRequest`:
+    `{"sdp": "...", "modeId": "devils-advocate"}`. Clients sending a raw SDP
+    body should use `POST /api/realtime/session/sdp` instead.
 
     Before creating the session, the endpoint checks if the client has exceeded
     their token usage limit. If exceeded, returns a 429 error with usage details.
 
     Args:
-        request: FastAPI Request object containing:
-            - Body: SDP offer string (JSON or plain text)
-            - Headers: Content-Type (application/json or text/plain)
-            - Query params: modeId (optional, for text/plain requests)
-        _: API key verification dependency (automatically handled).
+        payload: Session request containing the SDP offer and mode ID.
+            Unknown mode IDs fall back to devils-advocate.
+        request: FastAPI Request object used to extract client IP.
 
     Returns:
         Response: SDP answer from OpenAI with content-type "application/sdp".
@@ -108,7 +291,8 @@ async def create_session(
             - error: "Usage limit exceeded"
             - message: Human-readable message
             - usage: Current usage information
-        HTTPException: 400 if SDP data is missing or invalid JSON.
+        HTTPException: 400 if SDP data is empty.
+        HTTPException: 422 if the JSON body is invalid.
         HTTPException: 500 if:
             - Usage tracker is not initialized
             - OpenAI API key is not configured
@@ -138,144 +322,40 @@ async def create_session(
                     "total_tokens": 150000,
                     "tokens_limit": 100000,
                     "tokens_remaining": 0,
-                    "reset_at": "2026-01-12T09:34:28.123456",
+                    "reset_at": "2026-01-12T09:34:28.123456+00:00",
                     "limit_exceeded": true
                 }
             }
         }
         ```
     """
-    if shared.usage_tracker is None:
-        raise HTTPException(status_code=500, detail="Usage tracker not initialized")
+    logger.debug("Received JSON request with mode: %s", payload.modeId)
+    return await _create_realtime_session(request, payload.sdp, payload.modeId)
 
-    content_type = request.headers.get("content-type", "")
-    client_ip = get_client_ip(request)
-
-    # Check token usage limit
-    allowed, usage_info = await shared.usage_tracker.check_limit(client_ip)
-    if not allowed:
-        # Convert datetime to ISO string for JSON serialization
-        reset_at_str = usage_info.get("reset_at")
-        if isinstance(reset_at_str, datetime):
-            reset_at_str = reset_at_str.isoformat()
-        elif reset_at_str is None:
-            # Fallback to current time + 24 hours if reset_at is None
-            reset_at_str = (datetime.now() + timedelta(hours=24)).isoformat()
-        elif not isinstance(reset_at_str, str):
-            reset_at_str = str(reset_at_str)
-
-        # Calculate if limit is exceeded
-        limit_exceeded = usage_info["last_used_tokens"] >= usage_info["tokens_limit"]
-
-        usage_info_model = UsageInfo(
-            last_used_tokens=usage_info["last_used_tokens"],
-            total_tokens=usage_info["total_tokens"],
-            tokens_limit=usage_info["tokens_limit"],
-            tokens_remaining=usage_info["tokens_remaining"],
-            reset_at=reset_at_str,
-            limit_exceeded=limit_exceeded,
-        )
-
-        error_detail = UsageLimitErrorDetail(
-            error="Usage limit exceeded",
-            message="Usage limit reached. Resets in 24 hours.",
-            usage=usage_info_model,
-        )
-
-        raise HTTPException(status_code=429, detail=error_detail.model_dump())
-
-    logger.info(
-        f"Session creation request from {client_ip} "
-        f"(current: {usage_info['last_used_tokens']}/{usage_info['tokens_limit']}, "
-        f"total: {usage_info['total_tokens']})"
-    )
 
-    # Handle both JSON and text/plain content types
-    if "application/json" in content_type:
-        try:
-            body = await request.json()
-            sdp = body.get("sdp")
-            mode_id = body.get("modeId", "devils-advocate")
-            logger.debug(f"Received JSON request with mode: {mode_id}")
-        except Exception as e:
-            logger.error(f"Invalid JSON in request: {e}")
-            raise HTTPException(status_code=400, detail=f"Invalid JSON: {str(e)}")
-    else:
-        # Plain text SDP
-        sdp = await request.body()
-        sdp = sdp.decode("utf-8")
-        # Try to get modeId from query params
-        mode_id = request.query_params.get("modeId", "devils-advocate")
-        logger.debug(f"Received text/plain request with mode: {mode_id}")
-
-    if not sdp or not isinstance(sdp, str):
-        logger.warning("SDP data missing or invalid in request")
-        raise HTTPException(status_code=400, detail="SDP data is required")
-
-    if not settings.openai_api_key:
-        logger.error("OpenAI API key not configured")
-        raise HTTPException(
-            status_code=500, detail="Server configuration error: OpenAI API key not set"
-        )
-
-    session_config = get_session_config(mode_id)
-    logger.info(f"Creating session for mode: {mode_id}")
-
-    try:
-        # Create SSL context with certificates
-        # Use certifi if available (better for macOS), otherwise use default
-        if SSL_CERT_PATH:
-            ssl_context = ssl.create_default_context(cafile=SSL_CERT_PATH)
-        else:
-            ssl_context = ssl.create_default_context()
+@router.post(
+    "/api/realtime/session/sdp", responses={429: {"model": UsageLimitError}}
+)
+async def create_session_from_sdp(
+    request: Request,
+    modeId: str = _DEFAULT_MODE_ID,
+):
+    """
+    Create a new OpenAI Realtime API WebRTC session from a raw SDP body.
 
-        # Create connector with SSL context
-        connector = aiohttp.TCPConnector(ssl=ssl_context)
+    Behaves like `POST /api/realtime/session`, but takes the SDP offer as the
+    plain-text request body and the thinking mode as the `modeId` query parameter.
 
-        # OpenAI Realtime API expects multipart/form-data with sdp and session fields
-        form_data = aiohttp.FormData(default_to_multipart=True)
-        form_data.add_field("sdp", sdp)
-        form_data.add_field("session", session_config)
+    Args:
+        request: FastAPI Request object containing the SDP offer as its body.
+        modeId: Thinking mode identifier (default: "devils-advocate").
 
-        async with aiohttp.ClientSession(connector=connector) as session:
-            async with session.post(
-                f"{settings.openai_api_base}/v1/realtime/calls",
-                headers={
-                    "Authorization": f"Bearer {settings.openai_api_key}",
-                },
-                data=form_data,
-                timeout=aiohttp.ClientTimeout(total=30),
-            ) as response:
-                if not response.ok:
-                    error_text = await response.text()
-                    logger.error(
-                        f"OpenAI API error: {response.status} - {error_text[:200]}"
-                    )
-                    raise HTTPException(
-                        status_code=response.status,
-                        detail={
-                            "error": "Failed to create session",
-                            "details": error_text,
-                        },
-                    )
-
-                # Send back the SDP we received from the OpenAI REST API
-                answer_sdp = await response.text()
-                logger.info(f"Successfully created session for mode: {mode_id}")
-                return Response(content=answer_sdp, media_type="application/sdp")
+    Returns:
+        Response: SDP answer from OpenAI with content-type "application/sdp".
 
-    except aiohttp.ClientError as e:
-        logger.error(f"Network error during session creation: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=500,
-            detail={"error": "Failed to create session", "details": str(e)},
-        )
-    except Exception as e:
-        logger.error(f"Unexpected error during session creation: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal server error",
-                "details": "An unexpected error occurred",
-            },
-        )
+    Raises:
+        HTTPException: Same as `POST /api/realtime/session`.
+    """
+    sdp = (await request.body()).decode("utf-8")
+    logger.debug("Received text/plain request with mode: %s", modeId)
+    return await _create_realtime_session(request, sdp, modeId)
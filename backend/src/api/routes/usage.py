@@ -1,25 +1,29 @@
 """Usage tracking routes."""
 
-from datetime import datetime
-from fastapi import APIRouter, Request, HTTPException, Depends
+import logging
+from fastapi import APIRouter, Request, HTTPException
+from fastapi.responses import ORJSONResponse
 from src.api.models import UsageInfo, UsageReportRequest, UsageReportResponse
-from src.api.dependencies import get_client_ip, verify_api_key
+from src.api.dependencies import get_client_ip
 from src.api import shared
+from src.api.routing import ORJSONRoute
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+router = APIRouter(route_class=ORJSONRoute)
 
 
-@router.get("/api/usage", response_model=UsageInfo)
+# Response models are only declared for the OpenAPI schema; responses are
+# built from the tracker's usage dict and serialized without re-validation
+@router.get("/api/usage", responses={200: {"model": UsageInfo}})
 async def get_usage(
     request: Request,
-    _: bool = Depends(verify_api_key),
-) -> UsageInfo:
+) -> ORJSONResponse:
     """
     Get current token usage information for the requesting client.
 
     Retrieves the usage statistics for the client's IP address, including:
     - Tokens used in the current reset period (last_used_tokens)
-    - Total tokens used across all time (total_tokens)
+    - Total tokens used since the usage record was created (total_tokens)
     - Token limit for the current period (tokens_limit)
     - Remaining tokens in the current period (tokens_remaining)
     - When the usage will reset (reset_at)
@@ -29,14 +33,13 @@ async def get_usage(
 
     Args:
         request: FastAPI Request object used to extract client IP.
-        _: API key verification dependency (automatically handled).
 
     Returns:
-        UsageInfo: Current usage information for the client.
+        ORJSONResponse: UsageInfo JSON with the client's current usage.
 
     Raises:
         HTTPException: 500 if usage tracker is not initialized.
-        HTTPException: 401 if API key is missing or invalid.
+        HTTPException: 401/403 if API key is missing or invalid (APIKeyMiddleware).
 
     Example:
         ```json
@@ -45,7 +48,7 @@ async def get_usage(
             "total_tokens": 15000,
             "tokens_limit": 100000,
             "tokens_remaining": 95000,
-            "reset_at": "2026-01-12T09:34:28.123456",
+            "reset_at": "2026-01-12T09:34:28.123456+00:00",
             "limit_exceeded": false
         }
         ```
@@ -56,30 +59,15 @@ async def get_usage(
     client_ip = get_client_ip(request)
     usage_data = await shared.usage_tracker.get_usage(client_ip)
 
-    # Convert datetime to ISO string if needed
-    reset_at_str = usage_data["reset_at"]
-    if isinstance(reset_at_str, datetime):
-        reset_at_str = reset_at_str.isoformat()
+    # The tracker's usage dict has exactly the UsageInfo fields
+    return ORJSONResponse(usage_data)
 
-    # Calculate if limit is exceeded
-    limit_exceeded = usage_data["last_used_tokens"] >= usage_data["tokens_limit"]
 
-    return UsageInfo(
-        last_used_tokens=usage_data["last_used_tokens"],
-        total_tokens=usage_data["total_tokens"],
-        tokens_limit=usage_data["tokens_limit"],
-        tokens_remaining=usage_data["tokens_remaining"],
-        reset_at=reset_at_str,
-        limit_exceeded=limit_exceeded,
-    )
-
-
-@router.post("/api/usage/report", response_model=UsageReportResponse)
+@router.post("/api/usage/report", responses={200: {"model": UsageReportResponse}})
 async def report_usage(
     request_body: UsageReportRequest,
     request: Request,
-    _: bool = Depends(verify_api_key),
-) -> UsageReportResponse:
+) -> ORJSONResponse:
     """
     Report token usage and update client usage tracking.
 
@@ -91,17 +79,16 @@ async def report_usage(
         request_body: Request containing the number of tokens to report.
             - tokens (int): Number of tokens consumed (must be > 0).
         request: FastAPI Request object used to extract client IP.
-        _: API key verification dependency (automatically handled).
 
     Returns:
-        UsageReportResponse: Response containing:
+        ORJSONResponse: UsageReportResponse JSON containing:
             - success (bool): Whether the operation succeeded.
             - usage (UsageInfo): Updated usage information after adding tokens.
 
     Raises:
         HTTPException: 400 if tokens is <= 0.
         HTTPException: 500 if usage tracker is not initialized or operation fails.
-        HTTPException: 401 if API key is missing or invalid.
+        HTTPException: 401/403 if API key is missing or invalid (APIKeyMiddleware).
 
     Example Request:
         ```json
@@ -119,7 +106,7 @@ async def report_usage(
                 "total_tokens": 16234,
                 "tokens_limit": 100000,
                 "tokens_remaining": 93766,
-                "reset_at": "2026-01-12T09:34:28.123456",
+                "reset_at": "2026-01-12T09:34:28.123456+00:00",
                 "limit_exceeded": false
             }
         }
@@ -131,39 +118,14 @@ async def report_usage(
     try:
         client_ip = get_client_ip(request)
 
-        # Check limit before adding tokens
-        allowed_before, usage_before = await shared.usage_tracker.check_limit(client_ip)
-
-        # Add tokens
-        await shared.usage_tracker.add_tokens(client_ip, request_body.tokens)
-
-        # Check limit after adding tokens
-        usage_after = await shared.usage_tracker.get_usage(client_ip)
-        limit_exceeded = usage_after["last_used_tokens"] >= usage_after["tokens_limit"]
-
-        # Convert datetime to ISO string if needed
-        reset_at_str = usage_after["reset_at"]
-        if isinstance(reset_at_str, datetime):
-            reset_at_str = reset_at_str.isoformat()
-
-        usage_info = UsageInfo(
-            last_used_tokens=usage_after["last_used_tokens"],
-            total_tokens=usage_after["total_tokens"],
-            tokens_limit=usage_after["tokens_limit"],
-            tokens_remaining=usage_after["tokens_remaining"],
-            reset_at=reset_at_str,
-            limit_exceeded=limit_exceeded,
+        # Add tokens (resets the period first if due) and get the updated usage
+        usage_after = await shared.usage_tracker.add_tokens(
+            client_ip, request_body.tokens
         )
 
-        return UsageReportResponse(
-            success=True,
-            usage=usage_info,
-        )
+        return ORJSONResponse({"success": True, "usage": usage_after})
     except HTTPException:
         raise
-    except Exception as e:
-        import logging
-
-        logger = logging.getLogger(__name__)
-        logger.error(f"Error reporting usage: {e}")
+    except Exception:
+        logger.exception("Error reporting usage")
         raise HTTPException(status_code=500, detail="Failed to report usage")
@@ -1,13 +1,13 @@
 """
 Shared instances for storage and usage tracking.
-Initialized in main.py and used by routes.
+Initialized in the app lifespan (src/api/app.py) and used by routes.
 """
 
 from typing import Optional
 from src.storage.mongodb import MongoDBUsageStorage
 from src.usage_tracker import UsageTracker
 
-# These will be initialized in main.py
+# These will be initialized in the app lifespan
 storage: Optional[MongoDBUsageStorage] = None
 usage_tracker: Optional[UsageTracker] = None
 
@@ -18,16 +18,42 @@ def initialize_shared_instances(
     token_limit: int,
     reset_period_hours: int,
 ):
-    """Initialize shared storage and usage tracker instances."""
+    """
+    Initialize shared storage and usage tracker instances.
+
+    Must be called with a running event loop (from the app lifespan), since it
+    starts the usage tracker's background tasks.
+    """
     global storage, usage_tracker
     from src.usage_tracker import get_usage_tracker
 
+    # One storage (and so one MongoDB client and connection pool) per process
+    if storage is not None:
+        raise RuntimeError("Shared instances are already initialized")
+
     storage = MongoDBUsageStorage(
         mongodb_url=mongodb_url,
         database_name=mongodb_database,
+        reset_period_hours=reset_period_hours,
     )
     usage_tracker = get_usage_tracker(
         storage=storage,
         token_limit=token_limit,
         reset_period_hours=reset_period_hours,
     )
+    usage_tracker.start()
+
+
+async def close_shared_instances():
+    """Flush pending usage and close the shared storage connection."""
+    global storage, usage_tracker
+
+    try:
+        if usage_tracker is not None:
+            # Closes the tracker's storage as well
+            await usage_tracker.close()
+        elif storage is not None:
+            await storage.close()
+    finally:
+        storage = None
+        usage_tracker = None
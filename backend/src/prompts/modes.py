@@ -3,22 +3,37 @@ Mode-specific system prompts for the AI assistant.
 Each mode has a distinct personality and approach to challenging user thinking.
 """
 
+import sys
+from functools import lru_cache
+from types import MappingProxyType
+
 from .content.devils_advocate import MODE_CONFIG as DEVILS_ADVOCATE_CONFIG
 from .content.first_principles import MODE_CONFIG as FIRST_PRINCIPLES_CONFIG
 from .content.edge_case import MODE_CONFIG as EDGE_CASE_CONFIG
 from .content.second_order import MODE_CONFIG as SECOND_ORDER_CONFIG
 from .models import ModeConfig
 
-# Mode ID to configuration mapping
-_MODE_CONFIGS: dict[str, ModeConfig] = {
-    "devils-advocate": DEVILS_ADVOCATE_CONFIG,
-    "first-principles": FIRST_PRINCIPLES_CONFIG,
-    "edge-case": EDGE_CASE_CONFIG,
-    "second-order": SECOND_ORDER_CONFIG,
-}
+# Mode ID to configuration mapping (read-only). Mode IDs contain hyphens and
+# aren't interned automatically, so intern them to let lookups with interned
+# IDs short-circuit on identity.
+_MODE_CONFIGS: MappingProxyType[str, ModeConfig] = MappingProxyType(
+    {
+        sys.intern(mode_id): config
+        for mode_id, config in (
+            ("devils-advocate", DEVILS_ADVOCATE_CONFIG),
+            ("first-principles", FIRST_PRINCIPLES_CONFIG),
+            ("edge-case", EDGE_CASE_CONFIG),
+            ("second-order", SECOND_ORDER_CONFIG),
+        )
+    }
+)
 
 # Default mode fallback
-_DEFAULT_MODE = "devils-advocate"
+_DEFAULT_MODE = sys.intern("devils-advocate")
+_DEFAULT_CONFIG: ModeConfig = _MODE_CONFIGS[_DEFAULT_MODE]
+
+# Mode IDs in declaration order; immutable, so callers can share it
+_AVAILABLE_MODES: tuple[str, ...] = tuple(_MODE_CONFIGS.keys())
 
 
 def get_mode_config(mode_id: str) -> ModeConfig:
@@ -31,9 +46,10 @@ def get_mode_config(mode_id: str) -> ModeConfig:
     Returns:
         Mode configuration dictionary with voice and prompt, or default to devils-advocate
     """
-    return _MODE_CONFIGS.get(mode_id, _MODE_CONFIGS[_DEFAULT_MODE])
+    return _MODE_CONFIGS.get(mode_id, _DEFAULT_CONFIG)
 
 
+@lru_cache(maxsize=16)
 def get_instructions_for_mode(mode_id: str) -> str:
     """
     Get system instructions for a specific thinking mode.
@@ -47,6 +63,7 @@ def get_instructions_for_mode(mode_id: str) -> str:
     return get_mode_config(mode_id)["prompt"]
 
 
+@lru_cache(maxsize=16)
 def get_voice_for_mode(mode_id: str) -> str:
     """
     Get voice for a specific thinking mode.
@@ -60,11 +77,11 @@ def get_voice_for_mode(mode_id: str) -> str:
     return get_mode_config(mode_id)["voice"]
 
 
-def get_available_modes() -> list[str]:
+def get_available_modes() -> tuple[str, ...]:
     """
-    Get list of available mode IDs.
+    Get available mode IDs.
 
     Returns:
-        List of available mode identifiers
+        Tuple of available mode identifiers
     """
-    return list(_MODE_CONFIGS.keys())
+    return _AVAILABLE_MODES
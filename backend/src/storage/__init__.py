@@ -2,7 +2,7 @@
 Storage abstraction for usage tracking data.
 """
 
-from .base import UsageStorage
+from .base import PartialWriteError, UsageDelta, UsageStorage
 from .mongodb import MongoDBUsageStorage
 
-__all__ = ["UsageStorage", "MongoDBUsageStorage"]
+__all__ = ["PartialWriteError", "UsageDelta", "UsageStorage", "MongoDBUsageStorage"]
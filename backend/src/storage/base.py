@@ -3,13 +3,48 @@ Base storage interface for usage tracking data.
 """
 
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, NamedTuple
 from abc import ABC, abstractmethod
 
 
+class UsageDelta(NamedTuple):
+    """Buffered change to one client's usage."""
+
+    tokens: int  # Tokens to add to total_tokens
+    period_tokens: int  # Tokens to add to last_used_tokens (or set it to, with last_reset)
+    last_reset: Optional[datetime] = None  # Start of a new period, if one began
+
+    def combine(self, later: "UsageDelta") -> "UsageDelta":
+        """Merge a later delta for the same client into this one."""
+        if later.last_reset is not None:
+            return UsageDelta(
+                self.tokens + later.tokens, later.period_tokens, later.last_reset
+            )
+        return UsageDelta(
+            self.tokens + later.tokens,
+            self.period_tokens + later.period_tokens,
+            self.last_reset,
+        )
+
+
+class PartialWriteError(Exception):
+    """Raised when a batch of usage deltas was only partly applied."""
+
+    def __init__(self, failed: Dict[str, UsageDelta], message: str):
+        """
+        Args:
+            failed: Deltas that were not applied, keyed by client identifier
+            message: Description of the underlying failure
+        """
+        super().__init__(message)
+        self.failed = failed
+
+
 class UsageStorage(ABC):
     """Abstract base class for storage implementations."""
 
+    __slots__ = ()
+
     @abstractmethod
     async def get_usage(self, client_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -33,7 +68,8 @@ class UsageStorage(ABC):
         Args:
             client_id: Client identifier (IP address)
             last_used_tokens: Number of tokens used in current period (resets)
-            total_tokens: Total cumulative tokens used (never resets)
+            total_tokens: Cumulative tokens used (not reset by period resets; lost
+                if the record expires after two idle reset periods)
             last_reset: Timestamp of last reset
         """
         pass
@@ -49,11 +85,32 @@ class UsageStorage(ABC):
         """
         pass
 
+    @abstractmethod
+    async def apply_usage_deltas(self, deltas: Dict[str, UsageDelta]) -> None:
+        """
+        Apply buffered usage changes for several clients in one batch.
+
+        Args:
+            deltas: Mapping of client identifier to its usage delta. Deltas with
+                last_reset start a new period if the stored one had elapsed by
+                then: last_used_tokens is set to period_tokens instead of
+                incremented. Otherwise (the period was already restarted, e.g.
+                by another process) they are applied as plain increments.
+
+        Raises:
+            PartialWriteError: If some deltas were applied and others were not;
+                its failed mapping holds the ones that can be retried
+        """
+        pass
+
     @abstractmethod
     async def reset_usage(self, client_id: str) -> None:
         """
         Reset usage for a client (only resets last_used_tokens, preserves total_tokens).
 
+        Storage may expire records of clients idle for two reset periods, which
+        also discards their total_tokens.
+
         Args:
             client_id: Client identifier (IP address)
         """
@@ -2,32 +2,94 @@
 MongoDB implementation of usage storage.
 """
 
-from datetime import datetime
-from typing import Optional, Dict, Any
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, Tuple
 import logging
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import AsyncMongoClient, UpdateOne
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import BulkWriteError, OperationFailure
 
-# Try to use certifi for SSL certificates (better for macOS)
-try:
-    import certifi
+from .base import PartialWriteError, UsageDelta, UsageStorage
 
-    SSL_CERT_PATH = certifi.where()
-except ImportError:
-    SSL_CERT_PATH = None
+logger = logging.getLogger(__name__)
 
-from .base import UsageStorage
 
-logger = logging.getLogger(__name__)
+def _tls_ca_file(mongodb_url: str) -> Optional[str]:
+    """
+    Get the certifi CA bundle path if the connection URL uses TLS.
+
+    Passing tlsCAFile turns TLS on, so it is only set for mongodb+srv:// URLs
+    (TLS by default) or URLs that enable it explicitly. certifi is imported
+    here rather than at module import, as plain local connections never need it.
+
+    Returns:
+        Path to the CA bundle, or None to use the driver's defaults
+    """
+    url = mongodb_url.lower()
+    if "tls=false" in url or "ssl=false" in url:
+        return None
+    if not (
+        url.startswith("mongodb+srv://") or "tls=true" in url or "ssl=true" in url
+    ):
+        return None
+    # Try to use certifi for SSL certificates (better for macOS)
+    try:
+        import certifi
+    except ImportError:
+        return None
+    return certifi.where()
+
+
+# Stand-in last_reset for documents that have none, so any reset applies
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Fields read back into a usage dict; bookkeeping timestamps are left on the server
+_USAGE_PROJECTION = {
+    "_id": 0,
+    "last_used_tokens": 1,
+    "total_tokens": 1,
+    "last_reset": 1,
+}
+
+# One client (and so one connection pool) per URL and event loop, shared by
+# every storage instance; each entry is (client, number of instances using it)
+_clients: Dict[Tuple[str, int], Tuple[AsyncMongoClient, int]] = {}
 
 
 class MongoDBUsageStorage(UsageStorage):
     """MongoDB implementation of usage storage."""
 
+    __slots__ = (
+        "mongodb_url",
+        "database_name",
+        "collection_name",
+        "reset_period_hours",
+        "_reset_period",
+        "min_pool_size",
+        "max_pool_size",
+        "max_idle_time_ms",
+        "wait_queue_timeout_ms",
+        "server_selection_timeout_ms",
+        "client",
+        "db",
+        "collection",
+        "_client_key",
+        "_connect_lock",
+    )
+
     def __init__(
         self,
         mongodb_url: str,
         database_name: str,
         collection_name: str = "usage_tracking",
+        reset_period_hours: int = 24,
+        min_pool_size: int = 5,
+        max_pool_size: int = 50,
+        max_idle_time_ms: int = 30000,
+        wait_queue_timeout_ms: int = 5000,
+        server_selection_timeout_ms: int = 5000,
     ):
         """
         Initialize MongoDB storage.
@@ -36,62 +98,157 @@ class MongoDBUsageStorage(UsageStorage):
             mongodb_url: MongoDB connection URL
             database_name: Name of the database
             collection_name: Name of the collection (default: "usage_tracking")
+            reset_period_hours: Usage reset period; documents whose last reset is
+                older than two periods are expired by MongoDB (default: 24)
+            min_pool_size: Connections the driver keeps open in the background
+                (default: 5)
+            max_pool_size: Maximum concurrent connections (default: 50)
+            max_idle_time_ms: How long an idle connection is kept (default: 30000)
+            wait_queue_timeout_ms: How long a request waits for a free
+                connection when the pool is exhausted (default: 5000)
+            server_selection_timeout_ms: How long to wait for a reachable
+                server before failing (default: 5000)
         """
         self.mongodb_url = mongodb_url
         self.database_name = database_name
         self.collection_name = collection_name
-        self.client: Optional[AsyncIOMotorClient] = None
-        self.db: Optional[AsyncIOMotorDatabase] = None
+        self.reset_period_hours = reset_period_hours
+        self._reset_period = timedelta(hours=reset_period_hours)
+        self.min_pool_size = min_pool_size
+        self.max_pool_size = max_pool_size
+        self.max_idle_time_ms = max_idle_time_ms
+        self.wait_queue_timeout_ms = wait_queue_timeout_ms
+        self.server_selection_timeout_ms = server_selection_timeout_ms
+        self.client: Optional[AsyncMongoClient] = None
+        self.db: Optional[AsyncDatabase] = None
+        self.collection: Optional[AsyncCollection] = None
+        self._client_key: Optional[Tuple[str, int]] = None
+        self._connect_lock = asyncio.Lock()
+
+    def _acquire_client(self) -> None:
+        """
+        Attach to the shared client for this URL and event loop.
+
+        Creates the client if there is none yet; pool settings are taken from
+        the instance that creates it.
+        """
+        key = (self.mongodb_url, id(asyncio.get_running_loop()))
+        entry = _clients.get(key)
+        if entry is None:
+            # Size the pool explicitly and fail fast if no server is reachable
+            client_kwargs = {
+                "minPoolSize": self.min_pool_size,
+                "maxPoolSize": self.max_pool_size,
+                "maxIdleTimeMS": self.max_idle_time_ms,
+                "waitQueueTimeoutMS": self.wait_queue_timeout_ms,
+                "serverSelectionTimeoutMS": self.server_selection_timeout_ms,
+                "retryWrites": True,
+            }
+            # Configure SSL certificate verification using certifi
+            ca_file = _tls_ca_file(self.mongodb_url)
+            if ca_file:
+                client_kwargs["tlsCAFile"] = ca_file
+            entry = (AsyncMongoClient(self.mongodb_url, **client_kwargs), 0)
+
+        client, refs = entry
+        _clients[key] = (client, refs + 1)
+        self.client = client
+        self._client_key = key
 
     async def _connect(self):
-        """Connect to MongoDB if not already connected."""
-        if self.client is None:
+        """
+        Connect to MongoDB if not already connected.
+
+        Concurrent callers wait for a single connection attempt. The collection
+        is only published once the connection is verified and indexes are in
+        place, so callers never see a half-initialized storage.
+        """
+        async with self._connect_lock:
+            if self.collection is not None:
+                return
             try:
-                # Configure SSL certificate verification using certifi
-                client_kwargs = {}
-                if SSL_CERT_PATH:
-                    client_kwargs["tlsCAFile"] = SSL_CERT_PATH
-
-                self.client = AsyncIOMotorClient(self.mongodb_url, **client_kwargs)
-                if self.client is None:
-                    raise RuntimeError("Failed to create MongoDB client")
+                self._acquire_client()
                 self.db = self.client[self.database_name]
-                if self.db is None:
-                    raise RuntimeError("Failed to get database")
+                collection = self.db[self.collection_name]
                 # Test connection
                 await self.client.admin.command("ping")
-                logger.info(f"Connected to MongoDB: {self.database_name}")
+                logger.info("Connected to MongoDB: %s", self.database_name)
+                await self._ensure_indexes(collection)
+                await self._migrate_last_reset(collection)
             except Exception as e:
-                logger.error(f"Failed to connect to MongoDB: {e}", exc_info=True)
+                logger.error("Failed to connect to MongoDB: %s", e, exc_info=True)
+                # Release the client so the next call starts a fresh attempt
+                await self.close()
                 raise
 
-    async def _get_collection(self):
-        """Get the usage tracking collection."""
-        if self.db is None:
-            await self._connect()
-        if self.db is None:
-            raise RuntimeError("Database connection not available")
-        return self.db[self.collection_name]
+            self.collection = collection
 
-    async def get_usage(self, client_id: str) -> Optional[Dict[str, Any]]:
-        """Get usage data for a client."""
-        collection = await self._get_collection()
-        doc = await collection.find_one({"_id": client_id})
+    async def _ensure_indexes(self, collection: AsyncCollection):
+        """Create the TTL index that expires clients idle for two reset periods."""
+        try:
+            await collection.create_index(
+                "last_reset", expireAfterSeconds=self.reset_period_hours * 3600 * 2
+            )
+        except OperationFailure as e:
+            # e.g. an existing index with a different expiry; keep running with it
+            logger.warning("Could not create TTL index on last_reset: %s", e)
 
-        if not doc:
-            return None
+    async def _migrate_last_reset(self, collection: AsyncCollection):
+        """Convert last_reset values stored as ISO strings by older versions to dates."""
+        try:
+            # Unparseable strings become null, which the next reset overwrites
+            result = await collection.update_many(
+                {"last_reset": {"$type": "string"}},
+                [
+                    {
+                        "$set": {
+                            "last_reset": {
+                                "$convert": {
+                                    "input": "$last_reset",
+                                    "to": "date",
+                                    "onError": None,
+                                }
+                            }
+                        }
+                    }
+                ],
+            )
+        except OperationFailure as e:
+            # The data fix is best effort; don't fail startup over it
+            logger.warning("Could not convert string last_reset values: %s", e)
+            return
+        if result.modified_count:
+            logger.info(
+                "Converted last_reset to a date for %d clients", result.modified_count
+            )
 
-        # Convert last_reset to datetime if it's a string
+    @staticmethod
+    def _to_usage(doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a usage document to the storage usage dict."""
         last_reset = doc.get("last_reset")
-        if isinstance(last_reset, str):
-            last_reset = datetime.fromisoformat(last_reset)
+        if last_reset is None:
+            last_reset = datetime.now(timezone.utc)
+        elif last_reset.tzinfo is None:
+            # BSON dates are stored in UTC and decoded as naive datetimes
+            last_reset = last_reset.replace(tzinfo=timezone.utc)
 
         return {
             "last_used_tokens": doc.get("last_used_tokens", 0),
             "total_tokens": doc.get("total_tokens", 0),
-            "last_reset": last_reset or datetime.now(),
+            "last_reset": last_reset,
         }
 
+    async def get_usage(self, client_id: str) -> Optional[Dict[str, Any]]:
+        """Get usage data for a client."""
+        if self.collection is None:
+            await self._connect()
+        doc = await self.collection.find_one({"_id": client_id}, _USAGE_PROJECTION)
+
+        if not doc:
+            return None
+
+        return self._to_usage(doc)
+
     async def set_usage(
         self,
         client_id: str,
@@ -100,9 +257,10 @@ class MongoDBUsageStorage(UsageStorage):
         last_reset: datetime,
     ) -> None:
         """Set usage data for a client."""
-        collection = await self._get_collection()
-        now = datetime.now()
-        await collection.update_one(
+        if self.collection is None:
+            await self._connect()
+        now = datetime.now(timezone.utc)
+        await self.collection.update_one(
             {"_id": client_id},
             {
                 "$set": {
@@ -120,43 +278,116 @@ class MongoDBUsageStorage(UsageStorage):
 
     async def increment_tokens(self, client_id: str, tokens: int) -> None:
         """Increment token counts for a client (both last_used_tokens and total_tokens)."""
-        collection = await self._get_collection()
-        now = datetime.now()
-        # Check if document exists
-        doc = await collection.find_one({"_id": client_id})
-
-        if doc is None:
-            # Document doesn't exist - create it with initial values
-            await collection.insert_one(
-                {
-                    "_id": client_id,
+        if self.collection is None:
+            await self._connect()
+        now = datetime.now(timezone.utc)
+        # Single atomic upsert; creates the document on first use
+        await self.collection.update_one(
+            {"_id": client_id},
+            {
+                "$inc": {
                     "last_used_tokens": tokens,
                     "total_tokens": tokens,
+                },
+                "$set": {
+                    "updated_at": now,
+                },
+                "$setOnInsert": {
                     "last_reset": now,
                     "created_at": now,
+                },
+            },
+            upsert=True,
+        )
+
+    def _delta_update(
+        self, delta: UsageDelta, now: datetime
+    ) -> Dict[str, Any] | list[Dict[str, Any]]:
+        """Build the update document (or pipeline) for a usage delta."""
+        if delta.last_reset is None:
+            return {
+                "$inc": {
+                    "last_used_tokens": delta.period_tokens,
+                    "total_tokens": delta.tokens,
+                },
+                "$set": {
                     "updated_at": now,
-                }
-            )
-        else:
-            # Document exists - increment both fields
-            await collection.update_one(
-                {"_id": client_id},
-                {
-                    "$inc": {
-                        "last_used_tokens": tokens,
-                        "total_tokens": tokens,
+                },
+                "$setOnInsert": {
+                    "last_reset": now,
+                    "created_at": now,
+                },
+            }
+
+        # Start the new period only if the stored one had elapsed by the time
+        # of this reset. If another process already rolled the period over,
+        # add to its usage instead of overwriting it.
+        period_elapsed = {
+            "$lte": [
+                {"$ifNull": ["$last_reset", _EPOCH]},
+                delta.last_reset - self._reset_period,
+            ]
+        }
+        return [
+            {
+                "$set": {
+                    "last_used_tokens": {
+                        "$cond": [
+                            period_elapsed,
+                            delta.period_tokens,
+                            {
+                                "$add": [
+                                    {"$ifNull": ["$last_used_tokens", 0]},
+                                    delta.period_tokens,
+                                ]
+                            },
+                        ]
                     },
-                    "$set": {
-                        "updated_at": now,
+                    "last_reset": {
+                        "$cond": [period_elapsed, delta.last_reset, "$last_reset"]
                     },
-                },
+                    "total_tokens": {
+                        "$add": [{"$ifNull": ["$total_tokens", 0]}, delta.tokens]
+                    },
+                    "updated_at": now,
+                    "created_at": {"$ifNull": ["$created_at", now]},
+                }
+            }
+        ]
+
+    async def apply_usage_deltas(self, deltas: Dict[str, UsageDelta]) -> None:
+        """Apply usage deltas for several clients with a single bulk write."""
+        if not deltas:
+            return
+
+        if self.collection is None:
+            await self._connect()
+        now = datetime.now(timezone.utc)
+        items = list(deltas.items())
+        try:
+            await self.collection.bulk_write(
+                [
+                    UpdateOne(
+                        {"_id": client_id}, self._delta_update(delta, now), upsert=True
+                    )
+                    for client_id, delta in items
+                ],
+                ordered=False,
             )
+        except BulkWriteError as e:
+            # Unordered bulk writes apply every operation they can; only the
+            # ones listed in writeErrors were not applied
+            failed = dict(items[error["index"]] for error in e.details["writeErrors"])
+            raise PartialWriteError(
+                failed, f"{len(failed)} of {len(items)} usage updates failed: {e}"
+            ) from e
 
     async def reset_usage(self, client_id: str) -> None:
         """Reset usage for a client (only resets last_used_tokens, preserves total_tokens)."""
-        collection = await self._get_collection()
-        now = datetime.now()
-        await collection.update_one(
+        if self.collection is None:
+            await self._connect()
+        now = datetime.now(timezone.utc)
+        await self.collection.update_one(
             {"_id": client_id},
             {
                 "$set": {
@@ -172,9 +403,15 @@ class MongoDBUsageStorage(UsageStorage):
         )
 
     async def close(self) -> None:
-        """Close MongoDB connection."""
+        """Release the shared client, closing it once no instance uses it."""
         if self.client:
-            self.client.close()
+            client, refs = _clients.pop(self._client_key)
+            if refs > 1:
+                _clients[self._client_key] = (client, refs - 1)
+            else:
+                await client.close()
+                logger.info("Closed MongoDB connection")
             self.client = None
             self.db = None
-            logger.info("Closed MongoDB connection")
+            self.collection = None
+            self._client_key = None
@@ -0,0 +1,15 @@
+"""
+Token usage tracking and rate limiting per IP address.
+"""
+
+from .bucket import TokenBucket, TokenBucketStore
+from .queue import PendingWriteQueue
+from .tracker import UsageTracker, get_usage_tracker
+
+__all__ = [
+    "PendingWriteQueue",
+    "TokenBucket",
+    "TokenBucketStore",
+    "UsageTracker",
+    "get_usage_tracker",
+]
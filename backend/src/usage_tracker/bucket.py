@@ -0,0 +1,235 @@
+"""
+In-memory per-client token buckets backed by usage storage.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+from ..storage.base import UsageStorage
+from .queue import PendingWriteQueue
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class TokenBucket:
+    """Token allowance for one client in the current reset period."""
+
+    tokens: float  # Tokens remaining in the current period (negative once overdrawn)
+    last_refill: float  # time.monotonic() when the current period started
+    reset_at: datetime  # When the current period ends (UTC)
+    total_tokens: int = 0  # Lifetime tokens, including ones not yet written
+    loaded_at: float = 0.0  # time.monotonic() when read from storage
+    touched: bool = True  # Accessed since the last idle sweep
+
+
+class TokenBucketStore:
+    """
+    Sharded in-memory token buckets keyed by client ID.
+
+    Buckets are loaded from storage the first time a client is seen (one read
+    per client, however many requests miss at once) and then served from
+    memory without locking. Consumed tokens and period resets are handed to a
+    PendingWriteQueue, which writes them back in batches. Buckets not accessed
+    between two evict_idle() sweeps are dropped, so memory stays bounded.
+
+    Other processes (workers or instances) share the stored usage, so a
+    bucket older than reload_after_seconds is read again in the background
+    while the resident one keeps serving requests. A client active on several
+    processes can overshoot its limit by what they consume in that window.
+    """
+
+    __slots__ = (
+        "storage",
+        "writes",
+        "capacity",
+        "reset_period_seconds",
+        "reload_after_seconds",
+        "_reset_period",
+        "_shards",
+        "_shard_mask",
+    )
+
+    def __init__(
+        self,
+        storage: UsageStorage,
+        writes: PendingWriteQueue,
+        capacity: int,
+        reset_period_seconds: float,
+        reload_after_seconds: float = 5.0,
+        num_shards: int = 16,
+    ):
+        """
+        Initialize the bucket store.
+
+        Args:
+            storage: Storage implementation buckets are loaded from
+            writes: Queue that persists consumed tokens and period resets
+            capacity: Tokens available per client per reset period
+            reset_period_seconds: Length of a reset period in seconds
+            reload_after_seconds: How long a bucket is served before it is
+                read again to pick up other processes' usage (default: 5)
+            num_shards: Number of shards buckets are spread over (a power of two)
+
+        Raises:
+            ValueError: If num_shards is not a power of two
+        """
+        if num_shards <= 0 or num_shards & (num_shards - 1):
+            raise ValueError(f"num_shards must be a power of two, got {num_shards}")
+
+        self.storage = storage
+        self.writes = writes
+        self.capacity = capacity
+        self.reset_period_seconds = reset_period_seconds
+        self.reload_after_seconds = reload_after_seconds
+        self._reset_period = timedelta(seconds=reset_period_seconds)
+        # Each shard pairs its buckets with the loads in flight for it; string
+        # hashes are SipHash, so masking the low bits spreads clients evenly
+        self._shards: list[
+            tuple[Dict[str, TokenBucket], Dict[str, asyncio.Task[TokenBucket]]]
+        ] = [({}, {}) for _ in range(num_shards)]
+        self._shard_mask = num_shards - 1
+
+    async def _load(self, client_id: str) -> TokenBucket:
+        """Build a bucket from the client's stored usage."""
+        usage_data = await self.storage.get_usage(client_id) or {}
+        now = time.monotonic()
+        wall_now = datetime.now(timezone.utc)
+        last_used_tokens = usage_data.get("last_used_tokens", 0)
+        total_tokens = usage_data.get("total_tokens", 0)
+        last_reset = usage_data.get("last_reset")
+
+        # Apply this process's updates that storage doesn't have yet the way
+        # storage will, so a reload doesn't drop them
+        unwritten = self.writes.unwritten(client_id)
+        if unwritten is not None:
+            if unwritten.last_reset is not None and (
+                last_reset is None
+                or last_reset <= unwritten.last_reset - self._reset_period
+            ):
+                last_used_tokens, last_reset = 0, unwritten.last_reset
+            last_used_tokens += unwritten.period_tokens
+            total_tokens += unwritten.tokens
+
+        if last_reset is None:
+            # Persist the bucket's own period start, so the stored period ends
+            # when the in-memory one does rather than a period after the first
+            # flush. Anything queued before the reset only counts toward the
+            # total.
+            self.writes.reset(client_id, wall_now)
+            last_used_tokens, last_reset = 0, wall_now
+
+        # Map the stored wall-clock reset time onto the monotonic clock
+        return TokenBucket(
+            tokens=self.capacity - last_used_tokens,
+            last_refill=now - (wall_now - last_reset).total_seconds(),
+            reset_at=last_reset + self._reset_period,
+            total_tokens=total_tokens,
+            loaded_at=now,
+        )
+
+    async def _load_into(
+        self,
+        buckets: Dict[str, TokenBucket],
+        loads: Dict[str, asyncio.Task[TokenBucket]],
+        client_id: str,
+    ) -> TokenBucket:
+        """Load a client's bucket into its shard."""
+        try:
+            bucket = await self._load(client_id)
+            buckets[client_id] = bucket
+            return bucket
+        finally:
+            del loads[client_id]
+
+    def _start_load(
+        self,
+        buckets: Dict[str, TokenBucket],
+        loads: Dict[str, asyncio.Task[TokenBucket]],
+        client_id: str,
+    ) -> asyncio.Task[TokenBucket]:
+        """Start loading a client's bucket, registering the load with its shard."""
+        load = asyncio.create_task(self._load_into(buckets, loads, client_id))
+        loads[client_id] = load
+        return load
+
+    @staticmethod
+    def _log_reload_error(load: asyncio.Task[TokenBucket]) -> None:
+        """Log a failed background reload (the resident bucket stays in use)."""
+        if not load.cancelled() and load.exception() is not None:
+            logger.warning("Failed to reload token bucket: %s", load.exception())
+
+    def _refill(self, client_id: str, bucket: TokenBucket, now: float) -> None:
+        """Start a new period for the bucket if the current one has elapsed."""
+        elapsed = now - bucket.last_refill
+        if elapsed < self.reset_period_seconds:
+            return
+
+        # Derive the new start from the old one rather than the wall clock, so
+        # storage sees at least a full period between the two resets
+        last_reset = bucket.reset_at - self._reset_period + timedelta(seconds=elapsed)
+        bucket.tokens = self.capacity
+        bucket.last_refill = now
+        bucket.reset_at = last_reset + self._reset_period
+        self.writes.reset(client_id, last_reset)
+        logger.info("Reset usage for client %s", client_id)
+
+    async def allow_request(
+        self, client_id: str, tokens: int = 0
+    ) -> tuple[bool, TokenBucket]:
+        """
+        Check a client's allowance and consume tokens from it.
+
+        Args:
+            client_id: Client identifier (IP address)
+            tokens: Number of tokens to consume (0 to only check)
+
+        Returns:
+            (allowed, bucket) where allowed reflects the allowance before the
+            tokens were consumed
+        """
+        buckets, loads = self._shards[hash(client_id) & self._shard_mask]
+
+        bucket = buckets.get(client_id)
+        load = loads.get(client_id)
+        if bucket is None:
+            # Concurrent misses for a client share one storage read, while
+            # loads for other clients proceed independently
+            if load is None:
+                load = self._start_load(buckets, loads, client_id)
+            # Shielded so a cancelled request doesn't abort others' shared load
+            bucket = await asyncio.shield(load)
+        elif (
+            load is None
+            and time.monotonic() - bucket.loaded_at >= self.reload_after_seconds
+        ):
+            # Keep serving the resident bucket while a fresh one is read; if
+            # the read fails, it is retried after another reload period
+            bucket.loaded_at = time.monotonic()
+            self._start_load(buckets, loads, client_id).add_done_callback(
+                self._log_reload_error
+            )
+
+        # Nothing below awaits, so the update is atomic on the event loop
+        self._refill(client_id, bucket, time.monotonic())
+
+        allowed = bucket.tokens > 0
+        if tokens:
+            bucket.tokens -= tokens
+            bucket.total_tokens += tokens
+            self.writes.add(client_id, tokens)
+        bucket.touched = True
+
+        return allowed, bucket
+
+    def evict_idle(self) -> None:
+        """Drop buckets that were not accessed since the previous sweep."""
+        for buckets, _ in self._shards:
+            for client_id, bucket in list(buckets.items()):
+                if bucket.touched:
+                    bucket.touched = False
+                else:
+                    del buckets[client_id]
@@ -0,0 +1,184 @@
+"""
+Coalescing write queue for usage updates.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+from ..storage.base import PartialWriteError, UsageDelta, UsageStorage
+
+logger = logging.getLogger(__name__)
+
+
+class PendingWriteQueue:
+    """
+    Buffers usage updates and writes them to storage in batches.
+
+    Updates are merged straight into a pending delta per client, so adding one
+    is a dict update that never waits for storage. A background writer wakes
+    on the first pending update, lets more accumulate for max_delay_seconds,
+    then swaps out the pending deltas and applies them with a single bulk
+    write. Updates for the same client are merged in order, so tokens added
+    before a period reset only count toward the lifetime total. Only one batch
+    is written at a time, so batches reach storage in order.
+
+    Deltas that fail to write are put back ahead of newer updates and retried
+    with exponential backoff. If a partial bulk write applied some of them,
+    only the failed ones are retried, so no tokens are counted twice.
+    """
+
+    __slots__ = (
+        "storage",
+        "max_delay_seconds",
+        "max_retry_delay_seconds",
+        "close_attempts",
+        "_pending",
+        "_writing",
+        "_wakeup",
+        "_stopping",
+        "_task",
+    )
+
+    def __init__(
+        self,
+        storage: UsageStorage,
+        max_delay_seconds: float = 0.01,
+        max_retry_delay_seconds: float = 5.0,
+        close_attempts: int = 3,
+    ):
+        """
+        Initialize the write queue.
+
+        Args:
+            storage: Storage implementation batches are written to
+            max_delay_seconds: How long to let updates accumulate before
+                writing a batch (default: 10 ms)
+            max_retry_delay_seconds: Upper bound on the backoff between
+                retries of a failed batch (default: 5 s)
+            close_attempts: How many times close() tries to write the final
+                batch before giving up (default: 3)
+        """
+        self.storage = storage
+        self.max_delay_seconds = max_delay_seconds
+        self.max_retry_delay_seconds = max_retry_delay_seconds
+        self.close_attempts = close_attempts
+        self._pending: Dict[str, UsageDelta] = {}
+        self._writing: Dict[str, UsageDelta] = {}  # The batch being written
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    def _merge(self, client_id: str, delta: UsageDelta) -> None:
+        """Merge a delta into the client's pending delta and wake the writer."""
+        current = self._pending.get(client_id)
+        self._pending[client_id] = delta if current is None else current.combine(delta)
+        self._wakeup.set()
+
+    def add(self, client_id: str, tokens: int) -> None:
+        """Queue tokens consumed by a client in its current period."""
+        self._merge(client_id, UsageDelta(tokens, tokens))
+
+    def reset(self, client_id: str, last_reset: datetime) -> None:
+        """Queue the start of a new period for a client."""
+        self._merge(client_id, UsageDelta(0, 0, last_reset))
+
+    def unwritten(self, client_id: str) -> Optional[UsageDelta]:
+        """
+        Get a client's updates that storage has not confirmed yet.
+
+        Includes the batch being written, which storage may already have
+        applied, so a caller reading storage concurrently can count it twice.
+        """
+        writing = self._writing.get(client_id)
+        pending = self._pending.get(client_id)
+        if writing is None:
+            return pending
+        return writing if pending is None else writing.combine(pending)
+
+    def start(self) -> None:
+        """Start the background writer."""
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """
+        Write everything still pending and stop the writer.
+
+        Raises:
+            RuntimeError: If the pending updates still could not be written
+                after close_attempts tries
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        try:
+            await self._task
+        finally:
+            self._task = None
+
+    def _restore(self, failed: Dict[str, UsageDelta]) -> None:
+        """Put failed deltas back ahead of updates queued since they were taken."""
+        for client_id, delta in self._pending.items():
+            current = failed.get(client_id)
+            failed[client_id] = delta if current is None else current.combine(delta)
+        self._pending = failed
+
+    async def _write(
+        self, deltas: Dict[str, UsageDelta]
+    ) -> tuple[Dict[str, UsageDelta], Optional[Exception]]:
+        """
+        Write a batch to storage.
+
+        Returns:
+            (failed, error): the deltas that were not applied and the error
+            that caused it, or ({}, None) on success
+        """
+        try:
+            await self.storage.apply_usage_deltas(deltas)
+        except PartialWriteError as e:
+            logger.error("Failed to write token usage: %s", e)
+            return e.failed, e
+        except Exception as e:
+            logger.error("Failed to write token usage: %s", e, exc_info=True)
+            return deltas, e
+        return {}, None
+
+    async def _run(self):
+        """Write pending deltas in batches until close() is called."""
+        retry_delay = self.max_delay_seconds
+        close_failures = 0
+        while True:
+            await self._wakeup.wait()
+            if not self._stopping:
+                # Let concurrent requests add their updates to this batch
+                await asyncio.sleep(self.max_delay_seconds)
+            self._wakeup.clear()
+
+            deltas, self._pending = self._pending, {}
+            self._writing = deltas
+            try:
+                failed, error = await self._write(deltas) if deltas else ({}, None)
+            finally:
+                self._writing = {}
+            if failed:
+                self._restore(failed)
+                if self._stopping:
+                    close_failures += 1
+                    if close_failures >= self.close_attempts:
+                        raise RuntimeError(
+                            f"Could not write pending token usage for "
+                            f"{len(self._pending)} clients"
+                        ) from error
+                # Retry after a backoff even if no new updates arrive
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, self.max_retry_delay_seconds)
+                self._wakeup.set()
+                continue
+            retry_delay = self.max_delay_seconds
+
+            # Updates queued while the final batch was written get their own
+            if self._stopping and not self._pending:
+                return
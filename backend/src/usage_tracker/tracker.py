@@ -0,0 +1,195 @@
+"""
+Token usage tracking and rate limiting per IP address.
+"""
+
+import asyncio
+import logging
+from datetime import timedelta
+from functools import lru_cache
+from typing import Optional
+from ..storage.base import UsageStorage
+from .bucket import TokenBucket, TokenBucketStore
+from .queue import PendingWriteQueue
+
+logger = logging.getLogger(__name__)
+
+
+class UsageTracker:
+    """Tracks token usage per IP address with configurable limits."""
+
+    __slots__ = (
+        "storage",
+        "token_limit",
+        "reset_period",
+        "idle_timeout_seconds",
+        "_writes",
+        "_buckets",
+        "_evict_task",
+    )
+
+    def __init__(
+        self,
+        storage: UsageStorage,
+        token_limit: int = 100000,
+        reset_period_hours: int = 24,
+        idle_timeout_seconds: float = 60.0,
+        reload_after_seconds: float = 5.0,
+    ):
+        """
+        Initialize usage tracker.
+
+        Args:
+            storage: Storage implementation for persisting usage data
+            token_limit: Maximum tokens allowed per IP per reset period
+            reset_period_hours: Hours after which usage resets (default: 24)
+            idle_timeout_seconds: Seconds between sweeps that drop buckets of
+                idle clients from memory (default: 60)
+            reload_after_seconds: Seconds a client's usage is served from
+                memory before it is read again to pick up other processes'
+                usage (default: 5)
+        """
+        self.storage = storage
+        self.token_limit = token_limit
+        self.reset_period = timedelta(hours=reset_period_hours)
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self._writes = PendingWriteQueue(storage)
+        self._buckets = TokenBucketStore(
+            storage=storage,
+            writes=self._writes,
+            capacity=token_limit,
+            reset_period_seconds=self.reset_period.total_seconds(),
+            reload_after_seconds=reload_after_seconds,
+        )
+        self._evict_task: Optional[asyncio.Task] = None
+
+    def _get_client_id(self, ip_address: str) -> str:
+        """Get client identifier from IP address."""
+        return ip_address
+
+    def _build_usage_info(self, bucket: TokenBucket) -> dict:
+        """Build the usage info dict returned to callers."""
+        last_used_tokens = self.token_limit - int(bucket.tokens)
+        return {
+            "last_used_tokens": last_used_tokens,
+            "total_tokens": bucket.total_tokens,
+            "tokens_limit": self.token_limit,
+            "tokens_remaining": max(0, self.token_limit - last_used_tokens),
+            "reset_at": bucket.reset_at,
+            "limit_exceeded": last_used_tokens >= self.token_limit,
+        }
+
+    def start(self):
+        """Start the background tasks that write usage and evict idle clients."""
+        self._writes.start()
+        if self._evict_task is None:
+            self._evict_task = asyncio.create_task(self._evict_loop())
+
+    async def _evict_loop(self):
+        """Periodically drop idle clients' buckets."""
+        while True:
+            await asyncio.sleep(self.idle_timeout_seconds)
+            self._buckets.evict_idle()
+
+    async def get_usage(self, ip_address: str) -> dict:
+        """Get current usage for an IP address."""
+        client_id = self._get_client_id(ip_address)
+        _, bucket = await self._buckets.allow_request(client_id)
+        return self._build_usage_info(bucket)
+
+    async def check_limit(self, ip_address: str) -> tuple[bool, dict]:
+        """
+        Check if IP address has exceeded token limit.
+
+        Returns:
+            (allowed, usage_info)
+        """
+        client_id = self._get_client_id(ip_address)
+        allowed, bucket = await self._buckets.allow_request(client_id)
+        usage_info = self._build_usage_info(bucket)
+
+        if not allowed:
+            logger.warning(
+                "Token limit exceeded for %s: %d/%d tokens used",
+                ip_address,
+                usage_info["last_used_tokens"],
+                self.token_limit,
+            )
+
+        return allowed, usage_info
+
+    async def add_tokens(self, ip_address: str, tokens: int) -> dict:
+        """
+        Add tokens to usage tracking for an IP address.
+
+        Tokens are counted in memory immediately and written to storage in
+        batches by the pending write queue.
+
+        Args:
+            ip_address: Client IP address
+            tokens: Number of tokens to add (input + output)
+
+        Returns:
+            Usage info after the tokens were added
+        """
+        client_id = self._get_client_id(ip_address)
+        _, bucket = await self._buckets.allow_request(client_id, tokens)
+        usage_info = self._build_usage_info(bucket)
+
+        logger.info(
+            "Added %d tokens for %s. Current period: %d/%d, Total: %d",
+            tokens,
+            ip_address,
+            usage_info["last_used_tokens"],
+            self.token_limit,
+            usage_info["total_tokens"],
+        )
+
+        return usage_info
+
+    async def reset_all(self):
+        """Reset all usage (useful for testing or manual resets)."""
+        # Note: This would require storage to support clearing all data
+        # For now, we'll log a warning
+        logger.warning("reset_all() not implemented - requires storage support")
+
+    async def close(self):
+        """Stop background tasks, write any queued usage and close storage."""
+        if self._evict_task is not None:
+            self._evict_task.cancel()
+            try:
+                await self._evict_task
+            except asyncio.CancelledError:
+                pass
+            self._evict_task = None
+        try:
+            await self._writes.close()
+        finally:
+            await self.storage.close()
+
+
+@lru_cache(maxsize=None)
+def _make_usage_tracker(
+    storage: UsageStorage, token_limit: int, reset_period_hours: int
+) -> UsageTracker:
+    """Create the usage tracker for one storage and limit configuration."""
+    return UsageTracker(
+        storage=storage,
+        token_limit=token_limit,
+        reset_period_hours=reset_period_hours,
+    )
+
+
+def get_usage_tracker(
+    storage: UsageStorage,
+    token_limit: int = 100000,
+    reset_period_hours: int = 24,
+) -> UsageTracker:
+    """
+    Get or create the usage tracker for a storage and limit configuration.
+
+    Calls with the same storage instance and settings share one tracker,
+    however the arguments are passed; different arguments get their own
+    tracker instead of the first one created.
+    """
+    # Always pass positionally so the cache key doesn't depend on call style
+    return _make_usage_tracker(storage, token_limit, reset_period_hours)
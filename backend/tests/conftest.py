@@ -0,0 +1,64 @@
+"""
+Shared test fixtures.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+import pytest
+from src.storage.base import UsageDelta, UsageStorage
+
+
+class FakeUsageStorage(UsageStorage):
+    """In-memory UsageStorage that records calls and can be made to fail."""
+
+    __slots__ = (
+        "docs",
+        "get_calls",
+        "batches",
+        "failures",
+        "load_delay",
+        "write_delay",
+    )
+
+    def __init__(self):
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        self.get_calls: List[str] = []
+        self.batches: List[Dict[str, UsageDelta]] = []
+        # Exceptions raised by the next apply_usage_deltas calls, in order
+        self.failures: List[Exception] = []
+        self.load_delay = 0.0
+        self.write_delay = 0.0
+
+    async def get_usage(self, client_id: str) -> Optional[Dict[str, Any]]:
+        self.get_calls.append(client_id)
+        if self.load_delay:
+            await asyncio.sleep(self.load_delay)
+        return self.docs.get(client_id)
+
+    async def set_usage(self, client_id, last_used_tokens, total_tokens, last_reset):
+        self.docs[client_id] = {
+            "last_used_tokens": last_used_tokens,
+            "total_tokens": total_tokens,
+            "last_reset": last_reset,
+        }
+
+    async def increment_tokens(self, client_id: str, tokens: int) -> None:
+        await self.apply_usage_deltas({client_id: UsageDelta(tokens, tokens)})
+
+    async def apply_usage_deltas(self, deltas: Dict[str, UsageDelta]) -> None:
+        self.batches.append(dict(deltas))
+        if self.write_delay:
+            await asyncio.sleep(self.write_delay)
+        if self.failures:
+            raise self.failures.pop(0)
+
+    async def reset_usage(self, client_id: str) -> None:
+        self.docs.pop(client_id, None)
+
+    async def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def storage() -> FakeUsageStorage:
+    return FakeUsageStorage()
@@ -0,0 +1,214 @@
+"""
+Tests for the in-memory token bucket store.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+from src.storage.base import UsageDelta
+from src.usage_tracker import PendingWriteQueue, TokenBucketStore
+
+PERIOD = 3600.0
+
+
+def make_store(storage, capacity=100):
+    # The queue isn't started, so queued writes stay in _pending for inspection
+    writes = PendingWriteQueue(storage)
+    return TokenBucketStore(storage, writes, capacity, PERIOD), writes
+
+
+def test_num_shards_must_be_a_power_of_two(storage):
+    with pytest.raises(ValueError):
+        TokenBucketStore(storage, PendingWriteQueue(storage), 100, PERIOD, num_shards=6)
+
+
+def test_new_client_starts_with_full_allowance(storage):
+    store, writes = make_store(storage)
+
+    allowed, bucket = asyncio.run(store.allow_request("a", 30))
+
+    assert allowed
+    assert bucket.tokens == 70
+    assert bucket.total_tokens == 30
+    # The period start is written along with the first tokens
+    period_start = bucket.reset_at - timedelta(seconds=PERIOD)
+    assert writes._pending == {"a": UsageDelta(30, 30, period_start)}
+
+
+def test_bucket_loads_stored_usage(storage):
+    last_reset = datetime.now(timezone.utc) - timedelta(minutes=10)
+    storage.docs["a"] = {
+        "last_used_tokens": 100,
+        "total_tokens": 250,
+        "last_reset": last_reset,
+    }
+    store, _ = make_store(storage)
+
+    allowed, bucket = asyncio.run(store.allow_request("a"))
+
+    assert not allowed
+    assert bucket.tokens == 0
+    assert bucket.total_tokens == 250
+    assert bucket.reset_at == last_reset + timedelta(seconds=PERIOD)
+
+
+def test_refill_starts_a_new_period_once_elapsed(storage):
+    store, writes = make_store(storage)
+
+    async def run():
+        _, bucket = await store.allow_request("a", 150)
+        start = bucket.last_refill
+        reset_at = bucket.reset_at
+
+        store._refill("a", bucket, start + PERIOD - 1)
+        assert bucket.tokens == -50
+        assert bucket.reset_at == reset_at
+
+        store._refill("a", bucket, start + PERIOD + 1)
+        return bucket, start
+
+    bucket, start = asyncio.run(run())
+
+    assert bucket.tokens == 100
+    assert bucket.last_refill == start + PERIOD + 1
+    assert bucket.total_tokens == 150
+    # Tokens from the old period only count toward the total
+    delta = writes._pending["a"]
+    assert delta.tokens == 150
+    assert delta.period_tokens == 0
+    assert delta.last_reset is not None
+    assert bucket.reset_at == delta.last_reset + timedelta(seconds=PERIOD)
+
+
+def test_rollover_before_the_first_flush_starts_a_new_stored_period(storage):
+    store, writes = make_store(storage)
+
+    async def run():
+        _, bucket = await store.allow_request("a")  # Check only; nothing flushed
+        start = bucket.last_refill
+        await store.allow_request("a", 500)
+        first = writes._pending.pop("a")  # The first flush
+
+        store._refill("a", bucket, start + PERIOD + 1)
+        await store.allow_request("a", 300)
+        return bucket, first, writes._pending["a"]
+
+    bucket, first, second = asyncio.run(run())
+
+    # The stored period starts when the bucket's did, so the reset is applied
+    # rather than added to the old period's usage
+    assert second == UsageDelta(300, 300, bucket.reset_at - timedelta(seconds=PERIOD))
+    assert first.period_tokens == 500
+    assert first.last_reset <= second.last_reset - timedelta(seconds=PERIOD)
+
+
+def test_concurrent_misses_share_one_load(storage):
+    storage.load_delay = 0.05
+    store, _ = make_store(storage)
+
+    async def run():
+        return await asyncio.gather(
+            *(store.allow_request("a", 1) for _ in range(10)),
+            store.allow_request("b", 1),
+        )
+
+    results = asyncio.run(run())
+
+    assert sorted(storage.get_calls) == ["a", "b"]
+    buckets = {id(bucket) for _, bucket in results[:10]}
+    assert len(buckets) == 1
+    assert results[0][1].tokens == 90
+
+
+def test_cancelled_request_does_not_abort_shared_load(storage):
+    storage.load_delay = 0.05
+    store, _ = make_store(storage)
+
+    async def run():
+        first = asyncio.create_task(store.allow_request("a"))
+        second = asyncio.create_task(store.allow_request("a"))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    allowed, bucket = asyncio.run(run())
+
+    assert allowed
+    assert storage.get_calls == ["a"]
+
+
+def test_evict_idle_drops_buckets_untouched_since_last_sweep(storage):
+    store, _ = make_store(storage)
+
+    async def run():
+        await store.allow_request("idle")
+        await store.allow_request("active")
+        store.evict_idle()  # Clears the touched flags
+        await store.allow_request("active")
+        store.evict_idle()  # Drops "idle", keeps "active"
+        await store.allow_request("idle")
+
+    asyncio.run(run())
+
+    # "idle" was reloaded from storage after eviction; "active" never was
+    assert storage.get_calls == ["idle", "active", "idle"]
+
+
+def test_loaded_bucket_is_served_without_storage_reads(storage):
+    store, _ = make_store(storage)
+
+    async def run():
+        for _ in range(5):
+            await store.allow_request("a", 1)
+
+    asyncio.run(run())
+
+    assert storage.get_calls == ["a"]
+
+
+def test_stale_bucket_picks_up_other_processes_usage(storage):
+    store, _ = make_store(storage)
+
+    async def run():
+        _, bucket = await store.allow_request("a", 10)  # Not flushed yet
+        storage.docs["a"] = {
+            "last_used_tokens": 60,  # Written by another process
+            "total_tokens": 60,
+            "last_reset": bucket.reset_at - timedelta(seconds=PERIOD),
+        }
+        bucket.loaded_at -= store.reload_after_seconds
+
+        # Served from the resident bucket while the reload runs
+        _, stale = await store.allow_request("a")
+        await asyncio.sleep(0)
+        _, fresh = await store.allow_request("a")
+        return stale, fresh
+
+    stale, fresh = asyncio.run(run())
+
+    assert stale.tokens == 90
+    # Stored usage plus this process's unwritten tokens
+    assert fresh.tokens == 30
+    assert fresh.total_tokens == 70
+    assert storage.get_calls == ["a", "a"]
+
+
+def test_failed_reload_keeps_the_resident_bucket(storage, monkeypatch):
+    store, _ = make_store(storage)
+
+    async def fail(self, client_id):
+        raise ConnectionError("down")
+
+    async def run():
+        _, bucket = await store.allow_request("a", 10)
+        bucket.loaded_at -= store.reload_after_seconds
+        monkeypatch.setattr(type(storage), "get_usage", fail)
+        await store.allow_request("a")
+        await asyncio.sleep(0)
+        _, after = await store.allow_request("a", 5)
+        return bucket, after
+
+    bucket, after = asyncio.run(run())
+
+    assert after is bucket
+    assert after.tokens == 85
@@ -0,0 +1,143 @@
+"""
+Tests for the pending usage write queue.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+import pytest
+from src.storage.base import PartialWriteError, UsageDelta
+from src.usage_tracker import PendingWriteQueue
+
+RESET = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def make_queue(storage):
+    return PendingWriteQueue(
+        storage, max_delay_seconds=0.001, max_retry_delay_seconds=0.01
+    )
+
+
+def test_updates_are_merged_into_one_batch(storage):
+    async def run():
+        queue = make_queue(storage)
+        queue.start()
+        queue.add("a", 5)
+        queue.add("a", 7)
+        queue.reset("b", RESET)
+        queue.add("b", 3)
+        await queue.close()
+
+    asyncio.run(run())
+
+    assert storage.batches == [
+        {"a": UsageDelta(12, 12), "b": UsageDelta(3, 3, RESET)}
+    ]
+
+
+def test_writer_flushes_without_close(storage):
+    async def run():
+        queue = make_queue(storage)
+        queue.start()
+        queue.add("a", 5)
+        await asyncio.sleep(0.05)
+        flushed = list(storage.batches)
+        await queue.close()
+        return flushed
+
+    assert asyncio.run(run()) == [{"a": UsageDelta(5, 5)}]
+
+
+def test_failed_batch_is_retried_without_new_updates(storage):
+    storage.failures.append(ConnectionError("down"))
+
+    async def run():
+        queue = make_queue(storage)
+        queue.start()
+        queue.add("a", 5)
+        # No further updates arrive; the retry must happen on its own
+        await asyncio.sleep(0.1)
+        pending = dict(queue._pending)
+        await queue.close()
+        return pending
+
+    assert asyncio.run(run()) == {}
+    assert storage.batches == [{"a": UsageDelta(5, 5)}, {"a": UsageDelta(5, 5)}]
+
+
+def test_failed_batch_is_retried_ahead_of_newer_updates(storage):
+    storage.failures.append(ConnectionError("down"))
+    storage.write_delay = 0.02
+
+    async def run():
+        queue = make_queue(storage)
+        queue.start()
+        queue.add("a", 5)
+        await asyncio.sleep(0.01)  # While the (failing) first write is in flight
+        queue.reset("a", RESET)
+        queue.add("a", 2)
+        await queue.close()
+
+    asyncio.run(run())
+
+    # The retried tokens come before the reset, so they don't count toward
+    # the new period
+    assert storage.batches[-1] == {"a": UsageDelta(7, 2, RESET)}
+
+
+def test_partial_failure_only_retries_failed_deltas(storage):
+    storage.failures.append(
+        PartialWriteError({"b": UsageDelta(3, 3)}, "1 of 2 usage updates failed")
+    )
+
+    async def run():
+        queue = make_queue(storage)
+        queue.start()
+        queue.add("a", 5)
+        queue.add("b", 3)
+        await asyncio.sleep(0.1)
+        await queue.close()
+
+    asyncio.run(run())
+
+    assert storage.batches == [
+        {"a": UsageDelta(5, 5), "b": UsageDelta(3, 3)},
+        {"b": UsageDelta(3, 3)},
+    ]
+
+
+def test_close_retries_the_final_batch(storage):
+    storage.failures.append(ConnectionError("down"))
+
+    async def run():
+        queue = make_queue(storage)
+        queue.start()
+        queue.add("a", 5)
+        await queue.close()
+
+    asyncio.run(run())
+
+    assert storage.batches == [{"a": UsageDelta(5, 5)}, {"a": UsageDelta(5, 5)}]
+
+
+def test_close_raises_when_the_final_batch_cannot_be_written(storage):
+    storage.failures.extend(ConnectionError("down") for _ in range(10))
+
+    async def run():
+        queue = make_queue(storage)
+        queue.start()
+        queue.add("a", 5)
+        with pytest.raises(RuntimeError) as excinfo:
+            await queue.close()
+        return queue, excinfo.value
+
+    queue, error = asyncio.run(run())
+
+    assert isinstance(error.__cause__, ConnectionError)
+    assert len(storage.batches) == queue.close_attempts
+    assert queue._pending == {"a": UsageDelta(5, 5)}
+
+
+def test_close_without_start_is_a_no_op(storage):
+    asyncio.run(make_queue(storage).close())
+
+    assert storage.batches == []
@@ -0,0 +1,35 @@
+"""
+Tests for UsageDelta merging.
+"""
+
+from datetime import datetime, timezone
+from src.storage.base import UsageDelta
+
+RESET = datetime(2026, 1, 1, tzinfo=timezone.utc)
+LATER_RESET = datetime(2026, 1, 2, tzinfo=timezone.utc)
+
+
+def test_combine_adds_increments():
+    assert UsageDelta(3, 3).combine(UsageDelta(4, 4)) == UsageDelta(7, 7)
+
+
+def test_tokens_before_a_reset_only_count_toward_the_total():
+    merged = UsageDelta(10, 10).combine(UsageDelta(0, 0, RESET))
+    assert merged == UsageDelta(10, 0, RESET)
+
+
+def test_tokens_after_a_reset_count_toward_the_new_period():
+    merged = UsageDelta(0, 0, RESET).combine(UsageDelta(5, 5))
+    assert merged == UsageDelta(5, 5, RESET)
+
+
+def test_later_reset_wins():
+    merged = UsageDelta(2, 2, RESET).combine(UsageDelta(3, 3, LATER_RESET))
+    assert merged == UsageDelta(5, 3, LATER_RESET)
+
+
+def test_combine_is_associative():
+    deltas = [UsageDelta(4, 4), UsageDelta(0, 0, RESET), UsageDelta(6, 6)]
+    left = deltas[0].combine(deltas[1]).combine(deltas[2])
+    right = deltas[0].combine(deltas[1].combine(deltas[2]))
+    assert left == right == UsageDelta(10, 6, RESET)